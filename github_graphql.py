@@ -0,0 +1,85 @@
+import math
+import logging
+import orjson
+from tqdm import tqdm
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Commit history of the default branch, 100 commits per page, including line stats
+COMMIT_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $since: GitTimestamp, $until: GitTimestamp, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(since: $since, until: $until, first: 100, after: $cursor) {
+            totalCount
+            pageInfo { endCursor hasNextPage }
+            nodes {
+              oid
+              authoredDate
+              author { name }
+              additions
+              deletions
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+def run_query(post, query, variables):
+    """
+    POST a GraphQL query and return its `data`, or None on HTTP or GraphQL errors.
+    `post` is called like requests.post, so the caller controls pacing and retries.
+    """
+    response = post(GRAPHQL_URL, json={"query": query, "variables": variables})
+    if response.status_code != 200:
+        logging.error("Error running GraphQL query: %s", response.text)
+        return None
+    payload = orjson.loads(response.content)
+    if payload.get("errors"):
+        logging.error("GraphQL query returned errors: %s", payload["errors"])
+        return None
+    return payload["data"]
+
+def get_commit_history(post, owner, repo, since_date, until_date=None):
+    """
+    Fetch the default branch history between since_date and until_date (if provided),
+    following pageInfo.endCursor. Each node already carries additions and deletions.
+    Returns None if any query fails, so a partial history is never mistaken for a complete one.
+    """
+    variables = {
+        "owner": owner,
+        "name": repo,
+        "since": since_date.isoformat(),
+        "until": until_date.isoformat() if until_date else None,
+        "cursor": None,
+    }
+    nodes = []
+    pbar = None
+
+    while True:
+        data = run_query(post, COMMIT_HISTORY_QUERY, variables)
+        if data is None:
+            nodes = None
+            break
+        branch = data["repository"]["defaultBranchRef"]
+        if branch is None:
+            logging.info("Repository %s has no default branch.", repo)
+            break
+        history = branch["target"]["history"]
+        if pbar is None:
+            total_pages = max(1, math.ceil(history["totalCount"] / 100))
+            logging.info("Estimated total commit pages for %s: %s", repo, total_pages)
+            pbar = tqdm(total=total_pages, desc=f"Fetching commits for {repo}", unit="page")
+        nodes.extend(history["nodes"])
+        pbar.update(1)
+        if not history["pageInfo"]["hasNextPage"]:
+            break
+        variables["cursor"] = history["pageInfo"]["endCursor"]
+    if pbar:
+        pbar.close()
+    return nodes
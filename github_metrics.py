@@ -1,13 +1,23 @@
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import aiohttp
+import asyncio
 import datetime
 import time
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
+import json
+import orjson
+import pickle
 import argparse
 import logging
 from urllib.parse import urlparse, parse_qs
 from tqdm import tqdm  # added for progress bars
+from github_graphql import get_commit_history
 
 # Setup logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -20,6 +30,151 @@ GITHUB_OWNER = os.getenv('GITHUB_OWNER')
 # If a single repo is set in the env, it will be used as fallback
 GITHUB_REPO = os.getenv('GITHUB_REPO')
 HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"}
+# Upper bounds on concurrent requests; keeps us under GitHub's secondary rate limits
+MAX_CONNECTIONS = 20
+MAX_CONCURRENT_REQUESTS = 10
+# Below this many remaining requests, pacing spreads the rest of the quota until the reset
+RATE_LIMIT_LOW_WATERMARK = 100
+
+# Shared keep-alive session for synchronous requests, retrying transient 5xx errors.
+# POST is retried too since it is only used for read-only GraphQL queries.
+# Rate-limit rejections (429/403) are handled by _rate_limited_request instead.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+        raise_on_status=False,
+    ),
+))
+
+# How far before the latest saved commit an incremental refetch starts; the sha dedup drops repeats
+COMMIT_REFETCH_OVERLAP = datetime.timedelta(days=14)
+
+# Waits between retries of a rate-limited request that has no Retry-After or reset time
+RATE_LIMIT_BACKOFFS = [1, 2, 4]
+
+def _retry_delay(status, headers, attempt):
+    """
+    Seconds to wait before retrying a rate-limited response, or None if it was not rate limited.
+    Retry-After is honoured first; an exhausted primary quota waits until X-RateLimit-Reset.
+    """
+    if status not in (403, 429):
+        return None
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    retry_after = headers.get("Retry-After")
+    if retry_after is not None:
+        return int(retry_after)
+    if remaining == "0" and reset is not None:
+        return max(0, int(reset) - time.time()) + 1
+    if status == 429 or remaining == "0":
+        return RATE_LIMIT_BACKOFFS[attempt]
+    return None
+
+def _pacing_delay(headers):
+    """
+    Seconds to wait before the next request, from the X-RateLimit-* headers.
+    No wait while plenty of quota is left; otherwise spread the remainder until the reset.
+    """
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None or int(remaining) > RATE_LIMIT_LOW_WATERMARK:
+        return 0
+    return max(0, (int(reset) - time.time()) / max(int(remaining), 1))
+
+def _rate_limited_request(method, url, **kwargs):
+    """SESSION.request that waits out rate-limit rejections and paces successful responses."""
+    for attempt in range(len(RATE_LIMIT_BACKOFFS) + 1):
+        response = SESSION.request(method, url, **kwargs)
+        delay = _retry_delay(response.status_code, response.headers, attempt) if attempt < len(RATE_LIMIT_BACKOFFS) else None
+        if delay is None:
+            break
+        logging.warning("Rate limited fetching %s, retrying in %.0f s.", url, delay)
+        time.sleep(delay)
+    if response.status_code < 400:
+        time.sleep(_pacing_delay(response.headers))
+    return response
+
+def _rate_limited_get(url, params=None, headers=None):
+    return _rate_limited_request("GET", url, params=params, headers=headers)
+
+def _rate_limited_post(url, **kwargs):
+    return _rate_limited_request("POST", url, **kwargs)
+
+async def _rate_limited_get_async(session, url, params=None, headers=None):
+    """Async counterpart of _rate_limited_get; returns (status, headers, body bytes)."""
+    for attempt in range(len(RATE_LIMIT_BACKOFFS) + 1):
+        async with session.get(url, params=params, headers=headers) as response:
+            status, response_headers, body = response.status, response.headers, await response.read()
+        delay = _retry_delay(status, response_headers, attempt) if attempt < len(RATE_LIMIT_BACKOFFS) else None
+        if delay is None:
+            break
+        logging.warning("Rate limited fetching %s, retrying in %.0f s.", url, delay)
+        await asyncio.sleep(delay)
+    if status < 400:
+        await asyncio.sleep(_pacing_delay(response_headers))
+    return status, response_headers, body
+
+# Conditional request cache: ETags keyed by "repo/endpoint/page", bodies pickled alongside.
+# GitHub answers a matching If-None-Match with 304, which does not count against the rate limit.
+ETAG_CACHE_FILE = "etag_cache.json"
+RESPONSE_CACHE_DIR = "response_cache"
+
+def _load_etag_cache():
+    if os.path.exists(ETAG_CACHE_FILE):
+        with open(ETAG_CACHE_FILE) as f:
+            return json.load(f)
+    return {}
+
+ETAG_CACHE = _load_etag_cache()
+
+def _response_cache_path(cache_key):
+    return os.path.join(RESPONSE_CACHE_DIR, cache_key.replace("/", "__") + ".pkl")
+
+def _conditional_headers(cache_key):
+    """Return an If-None-Match header for cache_key if both its ETag and body are cached."""
+    etag = ETAG_CACHE.get(cache_key)
+    if etag and os.path.exists(_response_cache_path(cache_key)):
+        return {"If-None-Match": etag}
+    return {}
+
+def _read_cached_response(cache_key):
+    with open(_response_cache_path(cache_key), "rb") as f:
+        return pickle.load(f)
+
+def _store_cached_response(cache_key, etag, data, last_page=None):
+    """Persist the body (and last page number) of a 200 response under its ETag."""
+    if not etag:
+        return
+    os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
+    with open(_response_cache_path(cache_key), "wb") as f:
+        pickle.dump({"data": data, "last_page": last_page}, f)
+    ETAG_CACHE[cache_key] = etag
+    with open(ETAG_CACHE_FILE, "w") as f:
+        json.dump(ETAG_CACHE, f)
+
+def cached_get(url, params, cache_key):
+    """
+    GET a paginated endpoint with an ETag conditional request.
+    Returns (data, last_page); data is None if the request failed.
+    """
+    response = _rate_limited_get(url, params=params, headers=_conditional_headers(cache_key))
+    if response.status_code == 304:
+        cached = _read_cached_response(cache_key)
+        return cached["data"], cached["last_page"]
+    if response.status_code != 200:
+        logging.error("Error fetching %s: %s", url, response.text)
+        return None, None
+    data = orjson.loads(response.content)
+    last_page = parse_last_page(response)
+    _store_cached_response(cache_key, response.headers.get("ETag"), data, last_page)
+    return data, last_page
 
 def parse_last_page(response):
     """
@@ -39,167 +194,255 @@ def parse_last_page(response):
                     return int(qs["page"][0])
     return None
 
+async def _fetch_json(session, semaphore, url, params=None, cache_key=None):
+    """
+    Fetch a single URL and return its decoded JSON body, or None on error.
+    If cache_key is given, the request is made conditional on the cached ETag.
+    """
+    headers = _conditional_headers(cache_key) if cache_key else {}
+    async with semaphore:
+        status, response_headers, body = await _rate_limited_get_async(session, url, params, headers)
+    if status == 304:
+        return _read_cached_response(cache_key)["data"]
+    if status != 200:
+        logging.error("Error fetching %s: %s", url, body.decode(errors="replace"))
+        return None
+    data = orjson.loads(body)
+    if cache_key:
+        _store_cached_response(cache_key, response_headers.get("ETag"), data)
+    return data
+
+async def _fetch_all_json(requests_list):
+    """Fetch every (url, params, cache_key) triple concurrently, preserving the input order."""
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+        return await asyncio.gather(*[
+            _fetch_json(session, semaphore, url, params, cache_key)
+            for url, params, cache_key in requests_list
+        ])
+
+def fetch_pages(url, base_params, pages, cache_prefix):
+    """Fetch the given page numbers of a paginated endpoint concurrently."""
+    requests_list = [(url, {**base_params, "page": page}, f"{cache_prefix}/{page}") for page in pages]
+    return asyncio.run(_fetch_all_json(requests_list))
+
 def get_commits(owner, repo, since_date, until_date=None):
-    """Fetch commits between since_date and until_date (if provided) with a progress bar."""
-    url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-    commits = []
-    page = 1
-    total_pages = None
-    pbar = None
-
-    while True:
-        params = {"since": since_date.isoformat(), "per_page": 100, "page": page}
-        if until_date:
-            params["until"] = until_date.isoformat()
-        response = requests.get(url, headers=HEADERS, params=params)
-        if response.status_code != 200:
-            logging.error("Error fetching commits for %s/%s: %s", owner, repo, response.text)
-            break
-        if page == 1:
-            total_pages = parse_last_page(response)
-            if total_pages:
-                pbar = tqdm(total=total_pages, desc=f"Fetching commits for {repo}", unit="page")
-            else:
-                pbar = tqdm(desc=f"Fetching commits for {repo}", unit="page")
-            logging.info("Estimated total commit pages for %s: %s", repo, total_pages if total_pages else "Unknown")
-        data = response.json()
-        if not data:
-            logging.info("No more commits found on page %s for %s.", page, repo)
-            break
-        commits.extend(data)
-        pbar.update(1)
-        page += 1
-        time.sleep(1)  # pause to avoid rate limits
-    pbar.close()
+    """
+    Fetch commits between since_date and until_date (if provided) through the GraphQL API.
+    Each commit already includes its additions and deletions, so no per-commit requests are needed.
+    Returns None if the fetch failed part-way.
+    """
+    commits = get_commit_history(_rate_limited_post, owner, repo, since_date, until_date)
+    if commits is None:
+        logging.error("Error fetching commits for %s/%s.", owner, repo)
+        return None
     logging.info("Total commits fetched for %s: %s", repo, len(commits))
     return commits
 
-def get_commit_stats(commit_url):
-    """Retrieve commit details to get the stats (additions, deletions, total)."""
-    response = requests.get(commit_url, headers=HEADERS)
-    if response.status_code == 200:
-        data = response.json()
-        stats = data.get("stats", {})
-        return stats
-    else:
-        logging.error("Error fetching commit stats: %s", response.text)
-        return {}
+def prs_in_range(page, start_date, end_date, date_field="created_at"):
+    """
+    Slice a page of PRs sorted by date_field descending to those with
+    start_date <= date_field < end_date. Also returns whether the page reached PRs older than start_date.
+    """
+    dates = pd.to_datetime(pd.Series([pr[date_field] for pr in page]), format="%Y-%m-%dT%H:%M:%SZ", utc=True)
+    # Reverse to ascending order so the cutoffs can be found by binary search
+    ascending = dates.iloc[::-1]
+    first = len(page) - ascending.searchsorted(pd.Timestamp(end_date))
+    last = len(page) - ascending.searchsorted(pd.Timestamp(start_date))
+    return page[first:last], bool(last < len(page))
 
-def get_prs_between(owner, repo, start_date, end_date, state="closed"):
+def get_prs_between(owner, repo, start_date, end_date, state="closed", sort="created"):
     """
     Fetch pull requests in the date range:
-      start_date <= created_at < end_date.
-    Uses a progress bar if total pages can be estimated.
+      start_date <= <sort>_at < end_date,
+    where sort is "created" or "updated".
+    Pages are fetched concurrently in batches of MAX_CONCURRENT_REQUESTS; fetching stops
+    after the batch that reaches PRs older than start_date.
+    Returns None if any page fails, so a partial result is never saved as complete.
     """
     prs = []
-    page = 1
-    total_pages = None
-    pbar = None
     url = f"https://api.github.com/repos/{owner}/{repo}/pulls"
-    
-    while True:
-        params = {"state": state, "sort": "created", "direction": "desc", "per_page": 100, "page": page}
-        response = requests.get(url, headers=HEADERS, params=params)
-        if response.status_code != 200:
-            logging.error("Error fetching PRs for %s/%s: %s", owner, repo, response.text)
-            break
-        if page == 1:
-            total_pages = parse_last_page(response)
-            if total_pages:
-                pbar = tqdm(total=total_pages, desc=f"Fetching PRs for {repo}", unit="page")
-            else:
-                pbar = tqdm(desc=f"Fetching PRs for {repo}", unit="page")
-            logging.info("Estimated total PR pages for %s: %s", repo, total_pages if total_pages else "Unknown")
-        data = response.json()
-        if not data:
-            logging.info("No more PRs found on page %s for %s.", page, repo)
-            break
-        
-        for pr in data:
-            # Parse the PR created_at timestamp and mark it as UTC-aware
-            created_at = datetime.datetime.strptime(pr["created_at"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
-            if created_at >= end_date:
-                continue
-            if created_at < start_date:
+    params = {"state": state, "sort": sort, "direction": "desc", "per_page": 100}
+    date_field = f"{sort}_at"
+
+    cache_prefix = f"{repo}/pulls-{sort}"
+
+    data, total_pages = cached_get(url, {**params, "page": 1}, f"{cache_prefix}/1")
+    if data is None:
+        logging.error("Error fetching PRs for %s/%s.", owner, repo)
+        return None
+    total_pages = total_pages or 1
+    logging.info("Estimated total PR pages for %s: %s", repo, total_pages)
+    pbar = tqdm(total=total_pages, desc=f"Fetching PRs for {repo}", unit="page")
+    pages_data = [data]
+    next_page = 2
+
+    while pages_data:
+        for data in pages_data:
+            pbar.update(1)
+            if data is None:
+                logging.error("Error fetching a PR page for %s/%s.", owner, repo)
+                pbar.close()
+                return None
+            page_prs, reached_start = prs_in_range(data, start_date, end_date, date_field)
+            prs.extend(page_prs)
+            if reached_start:
                 logging.info("PRs older than %s reached for %s. Stopping PR fetch.", start_date, repo)
                 pbar.close()
                 return prs
-            prs.append(pr)
-        
-        if total_pages:
-            progress = (page / total_pages) * 100
-            logging.info("Fetched PRs page %s/%s (%.2f%% complete) with %s items for %s.", page, total_pages, progress, len(data), repo)
-        else:
-            logging.info("Fetched PRs page %s with %s items for %s.", page, len(data), repo)
-        pbar.update(1)
-        page += 1
-        time.sleep(1)
+        if next_page > total_pages:
+            break
+        last_page = min(next_page + MAX_CONCURRENT_REQUESTS - 1, total_pages)
+        logging.info("Fetching PR pages %s-%s/%s for %s.", next_page, last_page, total_pages, repo)
+        pages_data = fetch_pages(url, params, range(next_page, last_page + 1), cache_prefix)
+        next_page = last_page + 1
     pbar.close()
     logging.info("Total PRs fetched for %s: %s", repo, len(prs))
     return prs
 
-def process_data(owner, repo, months):
-    """Fetch commits and pull requests for the latest `months` period and tag the repo."""
+def commits_to_df(commits, repo):
+    """Flatten GraphQL commit nodes into a DataFrame with sha, date, author, line stats and repository."""
+    commits_df = (
+        pd.json_normalize(commits)
+        .reindex(columns=["oid", "authoredDate", "author.name", "additions", "deletions"])
+        .set_axis(["sha", "date", "author", "additions", "deletions"], axis=1)
+    )
+    commits_df["author"] = commits_df["author"].fillna("Unknown")
+    commits_df["date"] = pd.to_datetime(commits_df["date"], utc=True)
+    commits_df["total_changes"] = commits_df["additions"] + commits_df["deletions"]
+    commits_df["repository"] = repo
+    return commits_df
+
+def prs_to_df(prs, repo):
+    """Flatten raw pull request JSON into a DataFrame with one row per PR."""
+    prs_df = (
+        pd.json_normalize(prs)
+        .reindex(columns=["number", "created_at", "merged_at", "closed_at", "user.login"])
+        .set_axis(["pr_number", "created_at", "merged_at", "closed_at", "author"], axis=1)
+    )
+    prs_df["created_at"] = pd.to_datetime(prs_df["created_at"], utc=True)
+    prs_df["merged_at"] = pd.to_datetime(prs_df["merged_at"], utc=True)
+    prs_df["closed_at"] = pd.to_datetime(prs_df["closed_at"], utc=True)
+    prs_df["repository"] = repo
+    return prs_df
+
+def latest_saved_date(existing_df, repo, date_column):
+    """Return the most recent date_column value saved for repo, or None if there is none."""
+    if existing_df is None:
+        return None
+    latest = existing_df.loc[existing_df["repository"] == repo, date_column].max()
+    return None if pd.isna(latest) else latest
+
+def process_data(owner, repo, months, existing_commits_df=None, existing_prs_df=None):
+    """
+    Fetch commits and pull requests for the latest `months` period and tag the repo.
+    If previously saved data for the repo is given, only records newer than it are fetched.
+    Returns (None, None) if either fetch failed, so the repo's data is not saved with gaps.
+    """
     now = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc)
     since_date = now - datetime.timedelta(days=30 * months)
+    # Commits from merged branches keep their older dates, so step back from the saved anchor
+    latest_commit_date = latest_saved_date(existing_commits_df, repo, "date")
+    commits_since = latest_commit_date - COMMIT_REFETCH_OVERLAP if latest_commit_date is not None else since_date
+    # A PR closed since the last run may have been created long before it, so PRs are
+    # anchored on the latest saved closed_at and fetched by update time, which closing bumps.
+    prs_closed_since = latest_saved_date(existing_prs_df, repo, "closed_at")
     
     logging.info("Starting data fetch for repository %s for the latest %s months (since %s).", repo, months, since_date)
     
     # Fetch commits and their stats
-    logging.info("Fetching commits for %s...", repo)
-    commits = get_commits(owner, repo, since_date)
-    commit_data = []
-    for commit in commits:
-        commit_sha = commit["sha"]
-        # commit_detail_url = commit["url"]
-        # stats = get_commit_stats(commit_detail_url)
-        commit_time = commit["commit"]["author"]["date"]
-        author = commit["commit"]["author"].get("name", "Unknown")
-        commit_data.append({
-            "sha": commit_sha,
-            "date": commit_time,
-            "author": author,
-            # "additions": stats.get("additions", 0),
-            # "deletions": stats.get("deletions", 0),
-            # "total_changes": stats.get("total", 0),
-            "repository": repo
-        })
-    commits_df = pd.DataFrame(commit_data)
-    if not commits_df.empty:
-        commits_df["date"] = pd.to_datetime(commits_df["date"])
+    logging.info("Fetching commits for %s since %s...", repo, commits_since)
+    commits = get_commits(owner, repo, commits_since)
+    if commits is None:
+        return None, None
+    commits_df = commits_to_df(commits, repo)
     logging.info("Fetched %s commits for %s.", len(commits_df), repo)
     
     # Fetch pull requests within the date range
-    logging.info("Fetching pull requests for %s...", repo)
-    prs = get_prs_between(owner, repo, start_date=since_date, end_date=now, state="closed")
-    pr_data = []
-    for pr in prs:
-        pr_data.append({
-            "pr_number": pr["number"],
-            "created_at": pr["created_at"],
-            "merged_at": pr.get("merged_at"),
-            "closed_at": pr.get("closed_at"),
-            "author": pr["user"]["login"],
-            "repository": repo
-        })
-    prs_df = pd.DataFrame(pr_data)
-    if not prs_df.empty:
-        prs_df["created_at"] = pd.to_datetime(prs_df["created_at"])
-        prs_df["closed_at"] = pd.to_datetime(prs_df["closed_at"])
+    if prs_closed_since is not None:
+        logging.info("Fetching pull requests for %s updated since %s...", repo, prs_closed_since)
+        prs = get_prs_between(owner, repo, start_date=prs_closed_since, end_date=now, state="closed", sort="updated")
+    else:
+        logging.info("Fetching pull requests for %s since %s...", repo, since_date)
+        prs = get_prs_between(owner, repo, start_date=since_date, end_date=now, state="closed")
+    if prs is None:
+        return None, None
+    prs_df = prs_to_df(prs, repo)
     logging.info("Fetched %s pull requests for %s.", len(prs_df), repo)
     
     return commits_df, prs_df
 
+# On-disk layouts: SHAs as raw 20-byte values, author and repository dictionary-encoded
+COMMITS_SCHEMA = pa.schema([
+    pa.field("sha", pa.binary(20)),
+    pa.field("date", pa.timestamp("ns", tz="UTC")),
+    pa.field("author", pa.dictionary(pa.int32(), pa.string())),
+    pa.field("additions", pa.int64()),
+    pa.field("deletions", pa.int64()),
+    pa.field("total_changes", pa.int64()),
+    pa.field("repository", pa.dictionary(pa.int16(), pa.string())),
+])
+PRS_SCHEMA = pa.schema([
+    pa.field("pr_number", pa.int64()),
+    pa.field("created_at", pa.timestamp("ns", tz="UTC")),
+    pa.field("merged_at", pa.timestamp("ns", tz="UTC")),
+    pa.field("closed_at", pa.timestamp("ns", tz="UTC")),
+    pa.field("author", pa.dictionary(pa.int32(), pa.string())),
+    pa.field("repository", pa.dictionary(pa.int16(), pa.string())),
+])
+
+def write_parquet(df, filename, schema):
+    """Write df with an explicit schema, zstd compression and dictionary encoding."""
+    if df.empty:
+        # Empty frames carry float64 placeholder columns that cannot be cast to the schema
+        table = pa.Table.from_pylist([], schema=schema)
+    else:
+        table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    pq.write_table(table, filename, compression="zstd", use_dictionary=True)
+
+def save_commits_df(commits_df, filename):
+    write_parquet(commits_df.assign(sha=commits_df["sha"].map(bytes.fromhex)), filename, COMMITS_SCHEMA)
+
+def load_commits_df(filename):
+    """Read saved commits, turning the raw SHA bytes back into hex strings."""
+    commits_df = pd.read_parquet(filename)
+    commits_df["sha"] = commits_df["sha"].map(bytes.hex)
+    return commits_df
+
+def save_prs_df(prs_df, filename):
+    write_parquet(prs_df, filename, PRS_SCHEMA)
+
+def merge_new_records(existing_df, new_dfs, keys, date_column):
+    """
+    Add the rows of new_dfs whose `keys` columns are not already in existing_df (which may be None).
+    The saved data is kept sorted by date_column, so only the new rows are sorted. They are
+    appended or prepended when they fall after or before all saved rows, which covers
+    refetch and extend mode; otherwise a stable sort merges the two sorted runs.
+    """
+    new_df = pd.concat(new_dfs, ignore_index=True).drop_duplicates(subset=keys)
+    if existing_df is None:
+        return new_df.sort_values(by=date_column, kind="stable", ignore_index=True)
+    seen = pd.MultiIndex.from_frame(new_df[keys]).isin(pd.MultiIndex.from_frame(existing_df[keys]))
+    new_df = new_df[~seen].sort_values(by=date_column, kind="stable")
+    if new_df.empty:
+        return existing_df.reset_index(drop=True)
+    if existing_df.empty or new_df[date_column].iloc[0] >= existing_df[date_column].iloc[-1]:
+        return pd.concat([existing_df, new_df], ignore_index=True)
+    if new_df[date_column].iloc[-1] <= existing_df[date_column].iloc[0]:
+        return pd.concat([new_df, existing_df], ignore_index=True)
+    return pd.concat([existing_df, new_df], ignore_index=True).sort_values(by=date_column, kind="stable", ignore_index=True)
+
 def extend_all_commits_data(owner, repos, extend_months):
     """
-    Extend the combined commits data file ("commits_data_all.csv") by fetching additional
+    Extend the combined commits data file ("commits_data_all.parquet") by fetching additional
     commits for each repository from extend_months before the earliest saved commit.
     """
-    filename = "commits_data_all.csv"
+    filename = "commits_data_all.parquet"
     if not os.path.exists(filename):
         logging.error("%s not found. Run refetch mode first to fetch initial data.", filename)
         return None
-    existing_commits_df = pd.read_csv(filename, parse_dates=["date"])
+    existing_commits_df = load_commits_df(filename)
     extended_commits_list = []
     
     for repo in repos:
@@ -212,33 +455,18 @@ def extend_all_commits_data(owner, repos, extend_months):
         new_until = earliest_date
         logging.info("Extending commit data for repo %s: fetching commits from %s to %s.", repo, new_since, new_until)
         new_commits = get_commits(owner, repo, new_since, until_date=new_until)
-        new_commit_data = []
-        for commit in tqdm(new_commits, desc=f"Processing extended commits for {repo}", unit="commit"):
-            commit_sha = commit["sha"]
-            # commit_detail_url = commit["url"]
-            # stats = get_commit_stats(commit_detail_url)
-            commit_time = commit["commit"]["author"]["date"]
-            author = commit["commit"]["author"].get("name", "Unknown")
-            new_commit_data.append({
-                "sha": commit_sha,
-                "date": commit_time,
-                "author": author,
-                # "additions": stats.get("additions", 0),
-                # "deletions": stats.get("deletions", 0),
-                # "total_changes": stats.get("total", 0),
-                "repository": repo
-            })
-        new_commits_df = pd.DataFrame(new_commit_data)
+        if new_commits is None:
+            logging.error("Skipping commit extension for %s after a failed fetch.", repo)
+            continue
+        new_commits_df = commits_to_df(new_commits, repo)
         if not new_commits_df.empty:
-            new_commits_df["date"] = pd.to_datetime(new_commits_df["date"])
             extended_commits_list.append(new_commits_df)
         else:
             logging.info("No new commits found in the extended period for %s.", repo)
     
     if extended_commits_list:
-        new_data = pd.concat(extended_commits_list, ignore_index=True)
-        combined_df = pd.concat([existing_commits_df, new_data]).drop_duplicates(subset=["sha"]).sort_values(by="date")
-        combined_df.to_csv(filename, index=False)
+        combined_df = merge_new_records(existing_commits_df, extended_commits_list, ["sha"], "date")
+        save_commits_df(combined_df, filename)
         logging.info("Commits data extended successfully. Total commits now: %s", len(combined_df))
         return combined_df
     else:
@@ -247,14 +475,14 @@ def extend_all_commits_data(owner, repos, extend_months):
 
 def extend_all_prs_data(owner, repos, extend_months):
     """
-    Extend the combined pull requests data file ("prs_data_all.csv") by fetching additional
+    Extend the combined pull requests data file ("prs_data_all.parquet") by fetching additional
     PRs for each repository from extend_months before the earliest saved PR.
     """
-    filename = "prs_data_all.csv"
+    filename = "prs_data_all.parquet"
     if not os.path.exists(filename):
         logging.error("%s not found. Run refetch mode first to fetch initial data.", filename)
         return None
-    existing_prs_df = pd.read_csv(filename, parse_dates=["created_at", "closed_at"])
+    existing_prs_df = pd.read_parquet(filename)
     extended_prs_list = []
     
     for repo in repos:
@@ -267,28 +495,18 @@ def extend_all_prs_data(owner, repos, extend_months):
         new_end = earliest_date
         logging.info("Extending PR data for repo %s: fetching PRs from %s to %s.", repo, new_start, new_end)
         new_prs = get_prs_between(owner, repo, start_date=new_start, end_date=new_end, state="closed")
-        pr_data = []
-        for pr in new_prs:
-            pr_data.append({
-                "pr_number": pr["number"],
-                "created_at": pr["created_at"],
-                "merged_at": pr.get("merged_at"),
-                "closed_at": pr.get("closed_at"),
-                "author": pr["user"]["login"],
-                "repository": repo
-            })
-        new_prs_df = pd.DataFrame(pr_data)
+        if new_prs is None:
+            logging.error("Skipping PR extension for %s after a failed fetch.", repo)
+            continue
+        new_prs_df = prs_to_df(new_prs, repo)
         if not new_prs_df.empty:
-            new_prs_df["created_at"] = pd.to_datetime(new_prs_df["created_at"])
-            new_prs_df["closed_at"] = pd.to_datetime(new_prs_df["closed_at"])
             extended_prs_list.append(new_prs_df)
         else:
             logging.info("No new PRs found in the extended period for %s.", repo)
     
     if extended_prs_list:
-        new_data = pd.concat(extended_prs_list, ignore_index=True)
-        combined_df = pd.concat([existing_prs_df, new_data]).drop_duplicates(subset=["pr_number"]).sort_values(by="created_at")
-        combined_df.to_csv(filename, index=False)
+        combined_df = merge_new_records(existing_prs_df, extended_prs_list, ["repository", "pr_number"], "created_at")
+        save_prs_df(combined_df, filename)
         logging.info("PR data extended successfully. Total PRs now: %s", len(combined_df))
         return combined_df
     else:
@@ -302,7 +520,8 @@ if __name__ == "__main__":
     parser.add_argument("--mode", choices=["refetch", "extend"], required=True,
                         help="Select 'refetch' to fetch recent data or 'extend' to fetch additional older data.")
     parser.add_argument("--months", type=int, default=3,
-                        help="For refetch mode: fetch data for the latest X months.")
+                        help="For refetch mode: fetch data for the latest X months. Repositories that already "
+                             "have saved data only fetch records newer than it; use extend mode to go further back.")
     parser.add_argument("--extend_months", type=int, default=2,
                         help="For extend mode: fetch additional data from XX months before the earliest saved record.")
     parser.add_argument("--repos", type=str, required=False,
@@ -318,20 +537,33 @@ if __name__ == "__main__":
         repos = [GITHUB_REPO]
     
     if args.mode == "refetch":
+        # Previously saved data anchors an incremental fetch and is kept in the output
+        existing_commits_df = load_commits_df("commits_data_all.parquet") if os.path.exists("commits_data_all.parquet") else None
+        existing_prs_df = pd.read_parquet("prs_data_all.parquet") if os.path.exists("prs_data_all.parquet") else None
         commits_list = []
         prs_list = []
         for repo in repos:
             logging.info("Running in refetch mode for repository: %s", repo)
-            commits_df, prs_df = process_data(GITHUB_OWNER, repo, args.months)
-            commits_list.append(commits_df)
-            prs_list.append(prs_df)
+            commits_df, prs_df = process_data(GITHUB_OWNER, repo, args.months, existing_commits_df, existing_prs_df)
+            if commits_df is None:
+                logging.error("Not saving data for %s because a fetch failed; it will be retried next run.", repo)
+                continue
+            # Empty frames carry float64 placeholder columns that would upcast the merged dtypes
+            if not commits_df.empty:
+                commits_list.append(commits_df)
+            if not prs_df.empty:
+                prs_list.append(prs_df)
         if commits_list:
-            commits_all = pd.concat(commits_list, ignore_index=True).drop_duplicates(subset=["sha"]).sort_values(by="date")
-            commits_all.to_csv("commits_data_all.csv", index=False)
+            commits_all = merge_new_records(existing_commits_df, commits_list, ["sha"], "date")
+            save_commits_df(commits_all, "commits_data_all.parquet")
+        elif existing_commits_df is None:
+            save_commits_df(commits_to_df([], None), "commits_data_all.parquet")
         if prs_list:
-            prs_all = pd.concat(prs_list, ignore_index=True).drop_duplicates(subset=["pr_number"]).sort_values(by="created_at")
-            prs_all.to_csv("prs_data_all.csv", index=False)
-        logging.info("Data extraction complete. Saved to 'commits_data_all.csv' and 'prs_data_all.csv'.")
+            prs_all = merge_new_records(existing_prs_df, prs_list, ["repository", "pr_number"], "created_at")
+            save_prs_df(prs_all, "prs_data_all.parquet")
+        elif existing_prs_df is None:
+            save_prs_df(prs_to_df([], None), "prs_data_all.parquet")
+        logging.info("Data extraction complete. Saved to 'commits_data_all.parquet' and 'prs_data_all.parquet'.")
     elif args.mode == "extend":
         logging.info("Running in extend mode for repositories: %s", repos)
         extend_all_commits_data(GITHUB_OWNER, repos, args.extend_months)
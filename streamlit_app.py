@@ -5,12 +5,56 @@ import altair as alt
 
 st.title("GitHub Metrics Dashboard")
 
+# Resample rule for each time interval option
+RULE = {"Daily": "D", "Weekly": "W", "Byweekly": "2W", "Monthly": "ME"}
+
+def signed_log_delta(df):
+    """sign(delta) * log1p(|delta|), computed on the underlying ndarray in one pass."""
+    delta = df.diff().to_numpy()
+    return pd.DataFrame(np.sign(delta) * np.log1p(np.abs(delta)), index=df.index, columns=df.columns)
+
+# Display transforms applied to a resampled series; the second argument is the power exponent
+TRANSFORMS = {
+    "Total": lambda s, e: s,
+    "Cumulative": lambda s, e: s.cumsum(),
+    "Delta": lambda s, e: s.diff(),
+    "Percentage Change": lambda s, e: s.pct_change() * 100,
+    "Delta from the Average": lambda s, e: s - s.mean(),
+    "Signed Log Delta": lambda s, e: signed_log_delta(s),
+    "Power Transform": lambda s, e: s ** e,
+    "Exponential Transform": lambda s, e: np.exp(s),
+    "Log Transform": lambda s, e: np.log1p(s),
+}
+
 @st.cache_data
 def load_data():
-    commits_df = pd.read_csv("commits_data_all.csv", parse_dates=["date"])
-    prs_df = pd.read_csv("prs_data_all.csv", parse_dates=["created_at", "closed_at"])
+    commits_df = pd.read_parquet("commits_data_all.parquet")
+    prs_df = pd.read_parquet("prs_data_all.parquet")
+    # Categorical columns make repository filters and author groupbys compare integer codes
+    for df in (commits_df, prs_df):
+        df["repository"] = df["repository"].astype("category")
+        df["author"] = df["author"].astype("category")
+    # Index once by date so every resample reuses the same sorted DatetimeIndex
+    commits_df = commits_df.sort_values("date").set_index("date", drop=False)
+    prs_df = prs_df.sort_values("created_at").set_index("created_at", drop=False)
     return commits_df, prs_df
 
+@st.cache_data
+def contributor_table(df):
+    """Per-author commit count and (when available) total lines changed, in one groupby pass."""
+    aggregations = {"Count": ("sha", "size")}
+    if "total_changes" in df.columns:
+        aggregations["Total Changes"] = ("total_changes", "sum")
+    return df.groupby("author", sort=False, observed=True).agg(**aggregations).reset_index()
+
+@st.cache_data(show_spinner=False)
+def all_resamples(df, value_col, label):
+    """
+    Counts of value_col per interval for every RULE option, computed once per frame.
+    Switching the interval is then a dict lookup.
+    """
+    return {interval: df.resample(rule)[value_col].count().to_frame(label) for interval, rule in RULE.items()}
+
 commits_df, prs_df = load_data()
 
 # Sidebar repository selection with default "All" option
@@ -26,145 +70,44 @@ if repository_option != "All":
 
 # Sidebar options for time interval, metric breakdown, and math function type
 interval = st.sidebar.selectbox(
-    "Select time interval", options=["Daily", "Weekly", "Byweekly", "Monthly"], index=2
+    "Select time interval", options=list(RULE), index=2
 )
 metric_breakdown = st.sidebar.selectbox(
     "Metric for Contributor Breakdown", options=["Commits", "Lines Changed"]
 )
 math_function = st.sidebar.selectbox(
     "Select display type",
-    options=[
-        "Total", "Cumulative", "Delta", "Percentage Change", 
-        "Delta from the Average", "Signed Log Delta",
-        "Power Transform", "Exponential Transform", "Log Transform"
-    ],
+    options=list(TRANSFORMS),
     index=0
 )
 
 # For Power Transform, let user select the exponent
+exponent = None
 if math_function == "Power Transform":
     exponent = st.sidebar.slider("Select power exponent (p > 1)", min_value=1.1, max_value=5.0, value=2.0, step=0.1)
 
 # Resample commits data based on the selected interval
-if interval == "Daily":
-    commits_resampled = (
-        commits_df.set_index("date")
-        .resample("D")
-        .agg({"sha": "count"})
-        .rename(columns={"sha": "Commits"})
-    )
-elif interval == "Byweekly":
-    commits_resampled = (
-        commits_df.set_index("date")
-        .resample("2W")
-        .agg({"sha": "count"})
-        .rename(columns={"sha": "Commits"})
-    )
-elif interval == "Weekly":
-    commits_resampled = (
-        commits_df.set_index("date")
-        .resample("W")
-        .agg({"sha": "count"})
-        .rename(columns={"sha": "Commits"})
-    )
-else:  # Monthly
-    commits_resampled = (
-        commits_df.set_index("date")
-        .resample("M")
-        .agg({"sha": "count"})
-        .rename(columns={"sha": "Commits"})
-    )
+commits_resampled = all_resamples(commits_df, "sha", "Commits")[interval]
 
 # Apply selected math function for commits data
-if math_function == "Cumulative":
-    commits_final = commits_resampled.cumsum()
-elif math_function == "Delta":
-    commits_final = commits_resampled.diff()
-elif math_function == "Percentage Change":
-    commits_final = commits_resampled.pct_change() * 100
-elif math_function == "Delta from the Average":
-    commits_final = commits_resampled - commits_resampled.mean()
-elif math_function == "Signed Log Delta":
-    commits_delta = commits_resampled.diff()
-    commits_final = commits_delta.apply(lambda x: np.sign(x) * np.log1p(abs(x)))
-elif math_function == "Power Transform":
-    commits_final = commits_resampled ** exponent
-elif math_function == "Exponential Transform":
-    commits_final = np.exp(commits_resampled)
-elif math_function == "Log Transform":
-    commits_final = np.log1p(commits_resampled)
-else:
-    commits_final = commits_resampled
+commits_final = TRANSFORMS[math_function](commits_resampled, exponent)
 
 st.subheader(f"Commits ({interval}) ({math_function})")
 st.line_chart(commits_final)
 
 # Resample PR data by creation date for PRs created chart
-if interval == "Daily":
-    prs_resampled = (
-        prs_df.set_index("created_at")
-        .resample("D")
-        .count()[["pr_number"]]
-        .rename(columns={"pr_number": "PRs Created"})
-    )
-elif interval == "Byweekly":
-    prs_resampled = (
-        prs_df.set_index("created_at")
-        .resample("2W")
-        .count()[["pr_number"]]
-        .rename(columns={"pr_number": "PRs Created"})
-    )
-elif interval == "Weekly":
-    prs_resampled = (
-        prs_df.set_index("created_at")
-        .resample("W")
-        .count()[["pr_number"]]
-        .rename(columns={"pr_number": "PRs Created"})
-    )
-else:  # Monthly
-    prs_resampled = (
-        prs_df.set_index("created_at")
-        .resample("M")
-        .count()[["pr_number"]]
-        .rename(columns={"pr_number": "PRs Created"})
-    )
+prs_resampled = all_resamples(prs_df, "pr_number", "PRs Created")[interval]
 
 # Apply selected math function for PRs data
-if math_function == "Cumulative":
-    prs_final = prs_resampled.cumsum()
-elif math_function == "Delta":
-    prs_final = prs_resampled.diff()
-elif math_function == "Percentage Change":
-    prs_final = prs_resampled.pct_change() * 100
-elif math_function == "Delta from the Average":
-    prs_final = prs_resampled - prs_resampled.mean()
-elif math_function == "Signed Log Delta":
-    prs_delta = prs_resampled.diff()
-    prs_final = prs_delta.apply(lambda x: np.sign(x) * np.log1p(abs(x)))
-elif math_function == "Power Transform":
-    prs_final = prs_resampled ** exponent
-elif math_function == "Exponential Transform":
-    prs_final = np.exp(prs_resampled)
-elif math_function == "Log Transform":
-    prs_final = np.log1p(prs_resampled)
-else:
-    prs_final = prs_resampled
+prs_final = TRANSFORMS[math_function](prs_resampled, exponent)
 
 st.subheader(f"Pull Requests Created ({interval}) ({math_function})")
 st.line_chart(prs_final)
 
 # Contributor breakdown chart for the chosen metric
 st.subheader(f"Contributor Breakdown: {metric_breakdown}")
-if metric_breakdown == "Commits":
-    contributor_data = commits_df.groupby("author").size().reset_index(name="Count")
-else:  # Lines Changed
-    contributor_data = (
-        commits_df.groupby("author")["total_changes"]
-        .sum()
-        .reset_index(name="Total Changes")
-    )
-
-value_col = contributor_data.columns[1]
+value_col = "Count" if metric_breakdown == "Commits" else "Total Changes"
+contributor_data = contributor_table(commits_df)[["author", value_col]]
 contributor_data = contributor_data.sort_values(by=value_col, ascending=False)
 
 sorted_authors = contributor_data["author"].tolist()